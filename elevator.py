@@ -1,51 +1,104 @@
 # To be able to type classes defined later in the script
 from __future__ import annotations
-from typing import Iterator, Optional, List
+import os
+import sys
+from bisect import bisect_left
+from collections import defaultdict
+from enum import IntEnum
+from typing import (
+    ClassVar,
+    DefaultDict,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
 
 
-class Direction:
-    UP = "UP"
-    DOWN = "DOWN"
-    NOWHERE = "NOWHERE"
+# Set ELEVATOR_VERBOSE=0 in the environment to silence the per tick messages.
+# The messages are buffered: Controller.move_elevators and report_status write
+# them out, anything else driving elevators directly has to call flush_log.
+VERBOSE: bool = os.environ.get("ELEVATOR_VERBOSE", "1") == "1"
+_log: List[str] = []
+
+
+def log(message: str) -> None:
+    """Buffers a message until flush_log is called"""
+    _log.append(message)
+
+
+def flush_log() -> None:
+    """Writes out all the buffered messages with a single write"""
+    if _log:
+        sys.stdout.write("\n".join(_log) + "\n")
+        _log.clear()
+
+
+class Direction(IntEnum):
+    """The value is the floor step an elevator makes going in that direction"""
+
+    UP = 1
+    DOWN = -1
+    NOWHERE = 0
 
 
 class Controller:
+    # From how many waiting people on it is worth calling elevators with assign_batch
+    BATCH_SIZE: ClassVar[int] = 64
+
     def __init__(self) -> None:
         self.elevators: List[Elevator] = []
+        # Indexes kept in sync by the elevators, so lookups don't scan all of them
+        self._by_floor: DefaultDict[int, Set[Elevator]] = defaultdict(set)
+        self._free_set: Set[Elevator] = set()
+        # Free elevators sorted by floor, None when it needs to be sorted again
+        self._sorted_free: Optional[List[Tuple[int, int, Elevator]]] = None
 
     def add_elevator(self, elevator: Elevator) -> None:
         """
         Adds an elevator to a controller.
         """
+        elevator.position = len(self.elevators)
         self.elevators.append(elevator)
+        elevator.controller = self
+        self._by_floor[elevator.floor].add(elevator)
+        if elevator.is_free:
+            self._free_set.add(elevator)
+            self._sorted_free = None
 
     def report_status(self) -> None:
         """
         A helper function that prints out useful elevator information.
         """
+        flush_log()  # Anything that happened before comes first
+        lines = []
         for elevator in self.elevators:
-            print(f"{elevator} is at {elevator.floor} floor.")
-            print(f"{elevator}'s door are open: {elevator.door.is_open}")
-            print(f"{elevator} is going: {elevator.direction}")
-            print(
-                f"People in the {elevator}: {[person.name for person in elevator.people]}"
-            )
+            names = ", ".join(person.name for person in elevator.people.values())
+            lines.append(f"{elevator} is at {elevator.floor} floor.")
+            lines.append(f"{elevator}'s door are open: {elevator.door.is_open}")
+            lines.append(f"{elevator} is going: {elevator.direction.name}")
+            lines.append(f"People in the {elevator}: [{names}]")
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
 
     @property
     def free_elevators(self) -> List[Elevator]:
         if not self.elevators:
             raise ValueError("No elevators in this controller")
-        return [elevator for elevator in self.elevators if elevator.is_free]
+        return [elevator for elevator in self.elevators if elevator._is_free]
 
     def elevator_for(self, person: Person) -> Optional[Elevator]:
         """Return an elevator if it is at the floor"""
-        for elevator in self.elevators:
-            if (
-                elevator.floor == person.enter_floor
-                and elevator.LOWEST_FLOOR <= person.exit_floor <= elevator.HIGHEST_FLOOR
-            ):
-                return elevator
-        return None
+        found = None
+        for elevator in self._by_floor.get(person.enter_floor, ()):
+            if person.exit_floor in elevator._range:
+                # Sets are unordered, prefer the elevator added first
+                if found is None or elevator.position < found.position:
+                    found = elevator
+        return found
 
     def call_elevator_for(self, person: Person) -> Optional[Elevator]:
         """
@@ -53,30 +106,128 @@ class Controller:
         Returns a True if moved and False if not elevator to be moved.
         """
         # Pick an elevator that is the closest and can travel to this floor
+        if not self.elevators:
+            raise ValueError("No elevators in this controller")
+        free = self._sorted_free
+        if free is None:
+            free = self._sort_free_elevators()
+
+        # Walk away from the called floor one distance at a time, both ways,
+        # the first distance with a suitable elevator has the closest ones
+        enter_floor = person.enter_floor
+        exit_floor = person.exit_floor
         best_elevator = None
-        min_value = float("inf")
-        for elevator in self.free_elevators:
-            if (
-                elevator.LOWEST_FLOOR <= person.enter_floor <= elevator.HIGHEST_FLOOR
-                and elevator.LOWEST_FLOOR <= person.exit_floor <= elevator.HIGHEST_FLOOR
-            ):
-                floor_difference = abs(person.enter_floor - elevator.floor)
-                if floor_difference < min_value:
-                    min_value = floor_difference
+        below = above = bisect_left(free, (enter_floor,))
+        while best_elevator is None and (below > 0 or above < len(free)):
+            distance = min(
+                enter_floor - free[below - 1][0] if below > 0 else 10 ** 9,
+                free[above][0] - enter_floor if above < len(free) else 10 ** 9,
+            )
+            candidates = []
+            while below > 0 and enter_floor - free[below - 1][0] == distance:
+                below -= 1
+                candidates.append(free[below][2])
+            while above < len(free) and free[above][0] - enter_floor == distance:
+                candidates.append(free[above][2])
+                above += 1
+            for elevator in candidates:
+                if (
+                    # Already sent to someone since the elevators were sorted
+                    elevator._is_free
+                    and elevator.LOWEST_FLOOR <= enter_floor <= elevator.HIGHEST_FLOOR
+                    and elevator.LOWEST_FLOOR <= exit_floor <= elevator.HIGHEST_FLOOR
+                    # Prefer the elevator added first on a tie
+                    and (
+                        best_elevator is None
+                        or elevator.position < best_elevator.position
+                    )
+                ):
                     best_elevator = elevator
-        if not best_elevator:
+        if best_elevator is None:
             return None
 
         # Send an elevator
-        best_elevator.move_to(person.enter_floor)
+        best_elevator.move_to(enter_floor)
         return best_elevator
 
+    def _sort_free_elevators(self) -> List[Tuple[int, int, Elevator]]:
+        """
+        Sorts the free elevators by floor, so that call_elevator_for can
+        bisect them. Elevators sent somewhere later are skipped there, while
+        an elevator becoming free or a free one moving requires sorting again.
+        """
+        self._sorted_free = sorted(
+            (elevator._floor, elevator.position, elevator)
+            for elevator in self._free_set
+        )
+        return self._sorted_free
+
+    def assign_batch(self, people: List[Person]) -> List[Optional[Elevator]]:
+        """
+        Calls elevators for many people at once, the same way as calling
+        call_elevator_for for each of them in order would.
+
+        Distances between all free elevators and people are computed with
+        numpy, falls back to call_elevator_for if numpy is not installed.
+        """
+        try:
+            # Imported here, as it is slow to import and rarely needed
+            import numpy as np  # type: ignore[import-not-found]
+        except ImportError:
+            return [self.call_elevator_for(person) for person in people]
+        if not self.elevators:
+            raise ValueError("No elevators in this controller")
+
+        # Sorted, so that argmin prefers the elevator added first on a tie
+        free = sorted(self._free_set, key=lambda elevator: elevator.position)
+        if not free or not people:
+            return [None] * len(people)
+
+        enters = np.fromiter((p.enter_floor for p in people), np.int64, len(people))
+        exits = np.fromiter((p.exit_floor for p in people), np.int64, len(people))
+        lowest = np.fromiter((e.LOWEST_FLOOR for e in free), np.int64, len(free))
+        highest = np.fromiter((e.HIGHEST_FLOOR for e in free), np.int64, len(free))
+        floors = np.fromiter((e._floor for e in free), np.int64, len(free))
+
+        # Elevators in rows, people in columns
+        lowest, highest = lowest[:, None], highest[:, None]
+        reachable = (
+            (lowest <= enters)
+            & (enters <= highest)
+            & (lowest <= exits)
+            & (exits <= highest)
+        )
+        unreachable = 10 ** 9
+        distances = np.abs(floors[:, None] - enters)
+        distances[~reachable] = unreachable
+
+        called: List[Optional[Elevator]] = []
+        available = len(free)
+        for column, person in enumerate(people):
+            if not available:
+                called.append(None)
+                continue
+            row = int(distances[:, column].argmin())
+            if distances[row, column] == unreachable:
+                called.append(None)
+                continue
+            # Send an elevator, it is not free for anyone else anymore
+            elevator = free[row]
+            elevator.move_to(person.enter_floor)
+            distances[row] = unreachable
+            available -= 1
+            called.append(elevator)
+        return called
+
     def move_elevators(self) -> None:
         for elevator in self.elevators:
             elevator.move()
+        flush_log()
 
 
 class Door:
+    __slots__ = ("is_open",)
+
     def __init__(self, is_open: bool = False) -> None:
         self.is_open: bool = is_open
 
@@ -88,26 +239,76 @@ class Door:
 
 
 class Elevator:
-    COUNTER = 0
+    __slots__ = (
+        "door",
+        "_floor",
+        "HIGHEST_FLOOR",
+        "LOWEST_FLOOR",
+        "controller",
+        "_moving_to",
+        "_is_free",
+        "people",
+        "_by_exit",
+        "_stops_cache",
+        "_stop_queue_cache",
+        "_stop_dirty",
+        "_range",
+        "id",
+        "position",
+    )
+    COUNTER: ClassVar[int] = 0
 
     def __init__(self, lowest_floor: int, highest_floor: int) -> None:
         self.door: Door = Door()
-        self.floor: int = 0  # Starts from ground level
+        self._floor: int = 0  # Starts from ground level
         self.HIGHEST_FLOOR: int = highest_floor
         self.LOWEST_FLOOR: int = lowest_floor
-        self.moving_to: Optional[int] = None  # If None it means that the lift is unused
-        self.people: List[Person] = []
+        self.controller: Optional[Controller] = None  # Set by Controller.add_elevator
+        self.position: int = 0  # Index in the controller's elevators, breaks ties
+        self._moving_to: Optional[int] = None  # If None it means that the lift is unused
+        self._is_free: bool = True
+        self.people: Dict[int, Person] = {}  # By person id, in boarding order
+        self._by_exit: Dict[int, List[Person]] = {}  # People by their exit floor
+        # Memoized stops, invalidated whenever people or the floor change
+        self._stops_cache: Optional[List[int]] = None
+        self._stop_queue_cache: Optional[List[int]] = None
+        self._stop_dirty: bool = True
 
         self.validate()
+        self._range: range = range(self.LOWEST_FLOOR, self.HIGHEST_FLOOR + 1)
         Elevator.COUNTER += 1
         self.id = Elevator.COUNTER
 
     def __str__(self) -> str:
         return f"Elevator nr.{self.id}"
 
+    @property
+    def floor(self) -> int:
+        return self._floor
+
+    @floor.setter
+    def floor(self, floor: int) -> None:
+        self._set_floor(floor)
+
+    @property
+    def moving_to(self) -> Optional[int]:
+        return self._moving_to
+
+    @moving_to.setter
+    def moving_to(self, floor: Optional[int]) -> None:
+        was_free = self._is_free
+        self._moving_to = floor
+        self._is_free = floor is None
+        if self.controller is not None and self._is_free != was_free:
+            if self._is_free:
+                self.controller._free_set.add(self)
+                self.controller._sorted_free = None
+            else:
+                self.controller._free_set.discard(self)
+
     @property
     def is_free(self) -> bool:
-        return not bool(self.moving_to)
+        return self._is_free
 
     @property
     def stops(self) -> List[int]:
@@ -115,39 +316,61 @@ class Elevator:
         Returns a list of floors at which people inside the elevator
         want to get out.
         """
-        return [person.exit_floor for person in self.people]
+        if self._stops_cache is None:
+            self._stops_cache = [
+                person.exit_floor for person in self.people.values()
+            ]
+        return self._stops_cache
 
     @property
-    def direction(self) -> str:
+    def direction(self) -> Direction:
         """
         Returns the current direction in which the elvator is
         moving or null if not decided yet.
         """
-        if not self.moving_to:
-            return Direction.NOWHERE
-        if self.moving_to > self.floor:
-            return Direction.UP
-        if self.moving_to < self.floor:
-            return Direction.DOWN
-        else:
+        if self.moving_to is None:
             return Direction.NOWHERE
+        floor = self._floor
+        return Direction((self.moving_to > floor) - (self.moving_to < floor))
 
     @property
     def people_leaving(self) -> Iterator[Person]:
-        """Returns a list of people leaving at this floor"""
-        for person in self.people:
-            if person.exit_floor == self.floor:
-                yield person
+        """
+        Returns people leaving at this floor.
+
+        The people are taken out of the exit floor index, they are
+        expected to be removed from the elevator with remove_person.
+        """
+        yield from self._by_exit.pop(self._floor, ())
+
+    def add_person(self, person: Person) -> None:
+        self.people[person.id] = person
+        self._by_exit.setdefault(person.exit_floor, []).append(person)
+        self._stops_cache = None
+        self._stop_dirty = True
+
+    def remove_person(self, person: Person) -> None:
+        del self.people[person.id]
+        # Already gone from the index if taken out by people_leaving
+        leaving = self._by_exit.get(person.exit_floor)
+        if leaving and person in leaving:
+            leaving.remove(person)
+            if not leaving:
+                del self._by_exit[person.exit_floor]
+        self._stops_cache = None
+        self._stop_dirty = True
 
     def move_to(self, floor: int) -> None:
         self.moving_to = floor
 
     def open_door(self) -> None:
-        print(f"{self} door have opened")
+        if VERBOSE:
+            log(f"{self} door have opened")
         self.door.open()
 
     def close_door(self) -> None:
-        print(f"{self} door have closed")
+        if VERBOSE:
+            log(f"{self} door have closed")
         self.door.close()
 
     def move(self) -> None:
@@ -156,19 +379,39 @@ class Elevator:
 
         Each invocation represents one tick of time. 
         """
-        if self.door.is_open:
-            self.close_door()
-
-        if stops := self.stop_queue:
-            self.moving_to = stops[-1]
-
-        if self.direction == Direction.UP:
-            self.up_1()
-        elif self.direction == Direction.DOWN:
-            self.down_1()
+        # Same as close_door, inlined as this runs for every elevator every tick
+        door = self.door
+        if door.is_open:
+            door.is_open = False
+            if VERBOSE:
+                log(f"{self} door have closed")
+
+        # The door is closed from here on, so _step does not check it again
+        floor = self._floor
+        moving_to = self._moving_to
+        target = moving_to
+        stops = self.stops
+        if stops:
+            # The earliest request picks the direction, go to its furthest stop
+            oldest_request = stops[0]
+            if oldest_request > floor:
+                target = max(stops)
+            elif oldest_request < floor:
+                target = min(stops)
+
+        step = 0 if target is None else (target > floor) - (target < floor)
+        # The moving_to setter is only needed when the elevator becomes free or busy
+        if step:
+            if moving_to is None:
+                self.moving_to = target
+            else:
+                self._moving_to = target
+            self._step(step)
         else:
-            self.moving_to = None
-            print(f"{self} is not moving this round")
+            if moving_to is not None:
+                self.moving_to = None
+            if VERBOSE:
+                log(f"{self} is not moving this round")
 
     @property
     def stop_queue(self) -> Optional[List[int]]:
@@ -178,27 +421,29 @@ class Elevator:
         Given people going in different direction it will create a stop
         route directed by the earliest request.
         """
-
-        def filterUp(floor: int) -> bool:
-            return floor > self.floor
-
-        def filterDown(floor: int) -> bool:
-            return floor < self.floor
-
-        if not self.stops:
-            return None
-
-        oldest_request = self.stops[0]
-        stop_queue = []
-        if oldest_request > self.floor:
-            stop_queue = list(filter(filterUp, self.stops))
-        elif oldest_request < self.floor:
-            stop_queue = list(filter(filterDown, self.stops))
+        if not self._stop_dirty:
+            return self._stop_queue_cache
+
+        stops = self.stops
+        current_floor = self._floor
+        stop_queue = None
+        if stops:
+            oldest_request = stops[0]
+            stop_queue = []
+            if oldest_request > current_floor:
+                stop_queue = [floor for floor in stops if floor > current_floor]
+            elif oldest_request < current_floor:
+                stop_queue = [floor for floor in stops if floor < current_floor]
+
+        self._stop_queue_cache = stop_queue
+        self._stop_dirty = False
         return stop_queue
 
     def validate(self) -> None:
-        if type(self.LOWEST_FLOOR) != int or type(self.LOWEST_FLOOR) != int:
-            raise ValueError("Invalid lowest floor")
+        if not (
+            isinstance(self.LOWEST_FLOOR, int) and isinstance(self.HIGHEST_FLOOR, int)
+        ):
+            raise ValueError("Invalid floors, they have to be whole numbers")
         if self.LOWEST_FLOOR > 0:
             raise ValueError("Invalid lowest floor")
         if self.HIGHEST_FLOOR <= 0:
@@ -209,35 +454,57 @@ class Elevator:
     def up_1(self) -> None:
         if self.door.is_open:
             raise ValueError("Cannot move the elevator if the door is not closed")
-        if self.floor + 1 > self.HIGHEST_FLOOR:
-            raise ValueError(f"Can't go higher that the {self.HIGHEST_FLOOR} floor")
-        self.floor += 1
-        print(f"{self} moved floors {self.floor -1} -> {self.floor}")
+        self._step(Direction.UP)
 
     def down_1(self) -> None:
         if self.door.is_open:
             raise ValueError("Cannot move the elevator if the door is not closed")
-        if self.floor - 1 < self.LOWEST_FLOOR:
+        self._step(Direction.DOWN)
+
+    def _step(self, step: int) -> None:
+        """Moves by one floor up (1) or down (-1), expects a closed door"""
+        floor = self._floor + step
+        if floor > self.HIGHEST_FLOOR:
+            raise ValueError(f"Can't go higher that the {self.HIGHEST_FLOOR} floor")
+        if floor < self.LOWEST_FLOOR:
             raise ValueError(f"Can't go lower that the {self.LOWEST_FLOOR} floor")
-        self.floor -= 1
-        print(f"{self} moved floors {self.floor + 1} -> {self.floor}")
+        self._set_floor(floor)
+        if VERBOSE:
+            log(f"{self} moved floors {floor - step} -> {floor}")
 
+    def _set_floor(self, floor: int) -> None:
+        """Changes the floor keeping the controller's floor index in sync"""
+        if self.controller is not None:
+            self.controller._by_floor[self._floor].discard(self)
+            self.controller._by_floor[floor].add(self)
+            if self._is_free:
+                self.controller._sorted_free = None
+        self._floor = floor
+        self._stop_dirty = True
 
-class Person:
-    COUNTER = 0
 
-    def __init__(self, name: str, enter_floor: int, exit_floor: int) -> None:
-        self.name = name  # ID, might need to check if unique
-        self.enter_floor = int(enter_floor)
-        self.exit_floor = int(exit_floor)
+class Person:
+    __slots__ = ("name", "enter_floor", "exit_floor", "id", "_repr")
+    COUNTER: ClassVar[int] = 0
+
+    def __init__(
+        self, name: str, enter_floor: Union[int, str], exit_floor: Union[int, str]
+    ) -> None:
+        self.name: str = name  # ID, might need to check if unique
+        # Floors typed in by a user come in as strings
+        self.enter_floor: int = (
+            enter_floor if type(enter_floor) is int else int(enter_floor)
+        )
+        self.exit_floor: int = exit_floor if type(exit_floor) is int else int(exit_floor)
 
-        Person.COUNTER += 1
-        self.id = Person.COUNTER
+        self.id = Person.COUNTER = Person.COUNTER + 1
+        # People don't change once created, so the text is only built once
+        self._repr = (
+            f"<Person id:{self.id} -> {(self.name, self.enter_floor, self.exit_floor)}"
+        )
 
     def __repr__(self) -> str:
-        return str(self)
+        return self._repr
 
     def __str__(self) -> str:
-        return (
-            f"<Person id:{self.id} -> {(self.name, self.enter_floor, self.exit_floor)}"
-        )
+        return self._repr
@@ -1,14 +1,17 @@
 import argparse
 import sys
 import time
-from typing import List
+from typing import Callable, Dict, List, Tuple
 
 from prompt_toolkit import PromptSession
 from prompt_toolkit.formatted_text import HTML
 
+from elevator import VERBOSE
 from elevator import Controller
 from elevator import Elevator
 from elevator import Person
+from elevator import flush_log
+from elevator import log
 from draw import Screen
 
 
@@ -25,7 +28,9 @@ class Program:
         self.description: str = description
         self.lift_controller: Controller = controller
         self.people: List[Person] = people
-        self.waiting_for_elevator: List[Person] = people
+        self.waiting_for_elevator: Dict[int, Person] = {
+            person.id: person for person in people
+        }
 
     def setup_for_drawing(self) -> None:
         """
@@ -36,68 +41,77 @@ class Program:
     def report_status(self) -> None:
         """Prints out the status of the program"""
 
-        def names(people) -> List[str]:
-            return [person.name for person in people]
-
+        names = ", ".join(person.name for person in self.waiting_for_elevator.values())
         self.lift_controller.report_status()
-        print(f"People waiting for a lift {names(self.waiting_for_elevator)}")
+        print(f"People waiting for a lift [{names}]")
 
     def add_person_to_lift(self, elevator: Elevator, person: Person) -> None:
         """
         Moves a person into a lift. 
-
-        TODO: Provide better abstractions for adding and removing people.
         """
         if not elevator.door.is_open:
             elevator.open_door()
-        elevator.people.append(person)
-        self.waiting_for_elevator.remove(person)
-        print(f"{person.name} has entered the {elevator} at {elevator.floor} floor")
+        elevator.add_person(person)
+        self.waiting_for_elevator.pop(person.id, None)
+        if VERBOSE:
+            log(f"{person.name} has entered the {elevator} at {elevator.floor} floor")
 
     def remove_person_to_lift(self, elevator: Elevator, person: Person) -> None:
         """
         Removes people from a lift. 
-
-        TODO: Provide better abstractions removing people from a lift.
         """
         if not elevator.door.is_open:
             elevator.open_door()
-        elevator.people.remove(person)
+        elevator.remove_person(person)
 
         # If there are not people in the lift, it is not moving nowhere
         if not elevator.people:
             elevator.moving_to = None
-        print(f"{person.name} has {elevator} the lift at {elevator.floor} floor")
+        if VERBOSE:
+            log(f"{person.name} has {elevator} the lift at {elevator.floor} floor")
 
     def empty_line(self) -> None:
-        print()
+        if VERBOSE:
+            log("")
 
     def next(self) -> None:
         """
         Method triggering an action driven progression through a scenario.
         """
-        # Remove people leaving at current floors
-        for elevator in self.lift_controller.elevators:
-            for person in elevator.people_leaving:
-                self.remove_person_to_lift(elevator, person)
-
-        self.empty_line()
-        # Move people waiting into lifts if there is a lift at their floor
-        for person in self.waiting_for_elevator:
-            if elevator := self.lift_controller.elevator_for(person):
-                self.add_person_to_lift(elevator, person)
-
-        self.empty_line()
-        # For people waiting on the lift calls the elevator
-        for person in self.waiting_for_elevator:
-            if elevator := self.lift_controller.call_elevator_for(person):
-                print(f"An {elevator} for {person.name} is on its way!")
+        # Messages are written even if the tick fails half way, so that
+        # they come out before the error and don't leak into the next tick
+        try:
+            # Remove people leaving at current floors
+            for elevator in self.lift_controller.elevators:
+                for person in elevator.people_leaving:
+                    self.remove_person_to_lift(elevator, person)
+
+            self.empty_line()
+            # Move people waiting into lifts if there is a lift at their floor,
+            # the ones still waiting after that call an elevator
+            waiting = []
+            for person in list(self.waiting_for_elevator.values()):
+                if elevator := self.lift_controller.elevator_for(person):
+                    self.add_person_to_lift(elevator, person)
+                else:
+                    waiting.append(person)
+
+            self.empty_line()
+            if len(waiting) >= Controller.BATCH_SIZE:
+                called = self.lift_controller.assign_batch(waiting)
             else:
-                print(f"No elevator for {person.name} at the moment")
-
-        self.empty_line()
-        # Action elevators
-        self.lift_controller.move_elevators()
+                called = [self.lift_controller.call_elevator_for(p) for p in waiting]
+            for person, elevator in zip(waiting, called if VERBOSE else ()):
+                if elevator:
+                    log(f"An {elevator} for {person.name} is on its way!")
+                else:
+                    log(f"No elevator for {person.name} at the moment")
+
+            self.empty_line()
+            # Action elevators
+            self.lift_controller.move_elevators()
+        finally:
+            flush_log()
 
     def handle_input(self, answer: str) -> None:
         """
@@ -127,49 +141,68 @@ class Program:
         exit_floor = session.prompt(
             "> ", bottom_toolbar=HTML("The floor they need to exit")
         )
-        self.people.append(Person(name, enter_floor, exit_floor))
-
-
-scenario_1 = Program(
-    controller=Controller(),
-    people=[
-        Person("John", 0, 3),
-        Person("Jack", 0, 4),
-        Person("Jackson", 2, -1),
-        Person("Janet", 2, 3),
-    ],
-    description="Basic scenario with 4 people and 1 lift",
-)
-scenario_1.lift_controller.add_elevator(Elevator(-1, 4))
-
-
-scenario_2 = Program(
-    controller=Controller(),
-    people=[
-        Person("John", 1, 3),
-        Person("Jack", 0, -2),
-        Person("Jackson", 2, -1),
-        Person("Janet", 2, 3),
-    ],
-    description="Scenario at which the first person in the list of people is not at the ground floor",
-)
-scenario_2.lift_controller.add_elevator(Elevator(-3, 5))
-
-
-scenario_3 = Program(
-    controller=Controller(),
-    people=[
-        Person("John", 1, 3),
-        Person("Jack", 0, -2),
-        Person("Jackson", 2, -1),
-        Person("Janet", 2, 3),
-        Person("Joe", -3, 5),
-        Person("Jonathan", -1, 6),
-    ],
-    description="Scenario with 2 lifts and 6 people",
-)
-scenario_3.lift_controller.add_elevator(Elevator(-3, 5))
-scenario_3.lift_controller.add_elevator(Elevator(-1, 6))
+        person = Person(name, enter_floor, exit_floor)
+        self.people.append(person)
+        self.waiting_for_elevator[person.id] = person
+
+
+def scenario_1(description: str) -> Program:
+    program = Program(
+        controller=Controller(),
+        people=[
+            Person("John", 0, 3),
+            Person("Jack", 0, 4),
+            Person("Jackson", 2, -1),
+            Person("Janet", 2, 3),
+        ],
+        description=description,
+    )
+    program.lift_controller.add_elevator(Elevator(-1, 4))
+    return program
+
+
+def scenario_2(description: str) -> Program:
+    program = Program(
+        controller=Controller(),
+        people=[
+            Person("John", 1, 3),
+            Person("Jack", 0, -2),
+            Person("Jackson", 2, -1),
+            Person("Janet", 2, 3),
+        ],
+        description=description,
+    )
+    program.lift_controller.add_elevator(Elevator(-3, 5))
+    return program
+
+
+def scenario_3(description: str) -> Program:
+    program = Program(
+        controller=Controller(),
+        people=[
+            Person("John", 1, 3),
+            Person("Jack", 0, -2),
+            Person("Jackson", 2, -1),
+            Person("Janet", 2, 3),
+            Person("Joe", -3, 5),
+            Person("Jonathan", -1, 6),
+        ],
+        description=description,
+    )
+    program.lift_controller.add_elevator(Elevator(-3, 5))
+    program.lift_controller.add_elevator(Elevator(-1, 6))
+    return program
+
+
+# Scenarios are only built once picked
+SCENARIOS: List[Tuple[str, Callable[[str], Program]]] = [
+    ("Basic scenario with 4 people and 1 lift", scenario_1),
+    (
+        "Scenario at which the first person in the list of people is not at the ground floor",
+        scenario_2,
+    ),
+    ("Scenario with 2 lifts and 6 people", scenario_3),
+]
 
 
 if __name__ == "__main__":
@@ -181,10 +214,8 @@ if __name__ == "__main__":
     )
     args = parser.parse_args()
 
-    scenarios = [scenario_1, scenario_2, scenario_3]
-
-    for index, scenario in enumerate(scenarios):
-        print(f"{index + 1}. - {scenario.description}")
+    for index, (description, _) in enumerate(SCENARIOS):
+        print(f"{index + 1}. - {description}")
     answer = session.prompt(
         "> ",
         bottom_toolbar=HTML(
@@ -193,12 +224,12 @@ if __name__ == "__main__":
     )
 
     try:
-        scenario = scenarios[int(answer) - 1]
+        description, scenario = SCENARIOS[int(answer) - 1]
     except Exception:
         print("No such scenario")
         sys.exit()
 
-    program = scenario
+    program = scenario(description)
 
     print(args)
     if args.draw:
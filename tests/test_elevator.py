@@ -1,9 +1,16 @@
+import random
+import sys
+
 import pytest
 
+import elevator as elevator_module
 from elevator import Controller
+from elevator import Direction
 from elevator import Door
 from elevator import Elevator
 from elevator import Person
+from elevator import flush_log
+from elevator import log
 
 
 class TestController:
@@ -15,16 +22,144 @@ class TestController:
         assert controller.elevators[0] == elevator
 
     def test_free_elevators(self):
-        pass
+        controller = Controller()
+        with pytest.raises(ValueError):
+            controller.free_elevators
+        first, second = Elevator(0, 4), Elevator(0, 4)
+        controller.add_elevator(first)
+        controller.add_elevator(second)
+        assert controller.free_elevators == [first, second]
+        first.move_to(3)
+        assert controller.free_elevators == [second]
+        first.moving_to = None
+        assert controller.free_elevators == [first, second]
 
     def test_elevator_for(self):
-        pass
+        controller = Controller()
+        short, tall = Elevator(0, 2), Elevator(-1, 4)
+        controller.add_elevator(short)
+        controller.add_elevator(tall)
+        assert controller.elevator_for(Person("Jess", 0, 1)) == short
+        assert controller.elevator_for(Person("Jess", 0, 4)) == tall
+        assert controller.elevator_for(Person("Jess", 1, 2)) is None
+        tall.up_1()
+        assert controller.elevator_for(Person("Jess", 1, 2)) == tall
+        assert controller.elevator_for(Person("Jess", 0, 4)) is None
+
+    def test_setting_floor_updates_lookups(self):
+        controller = Controller()
+        elevator = Elevator(0, 4)
+        controller.add_elevator(elevator)
+        elevator.floor = 2
+        assert controller.elevator_for(Person("Jess", 2, 3)) == elevator
+        assert controller.elevator_for(Person("Jack", 0, 3)) is None
+        assert controller.call_elevator_for(Person("Joe", 3, 4)) == elevator
+        assert elevator.direction == Direction.UP
 
-    def test_call_elevator_for(self):
-        pass
+    def test_ties_go_to_the_elevator_added_first(self):
+        controller = Controller()
+        first, second = Elevator(0, 4), Elevator(0, 4)
+        controller.add_elevator(second)
+        controller.add_elevator(first)
+        assert controller.elevator_for(Person("Jess", 0, 3)) == second
+        assert controller.call_elevator_for(Person("Jess", 2, 3)) == second
+        second.moving_to = None
+        assert controller.assign_batch([Person("Jack", 2, 3)]) == [second]
 
-    def test_move_elevators(self):
-        pass
+    def test_call_elevator_for(self):
+        controller = Controller()
+        with pytest.raises(ValueError):
+            controller.call_elevator_for(Person("Jess", 0, 1))
+        near, far = Elevator(0, 4), Elevator(0, 4)
+        controller.add_elevator(far)
+        controller.add_elevator(near)
+        near.up_1()
+        assert controller.call_elevator_for(Person("Jess", 2, 0)) == near
+        assert near.moving_to == 2
+        assert controller.call_elevator_for(Person("Jack", 2, 0)) == far
+        assert controller.call_elevator_for(Person("Joe", 2, 0)) is None
+        assert controller.call_elevator_for(Person("Jim", 2, 5)) is None
+
+    @staticmethod
+    def build_busy_building():
+        randomizer = random.Random(7)
+        controller = Controller()
+        for _ in range(12):
+            highest = randomizer.randint(1, 10)
+            elevator = Elevator(randomizer.randint(-5, 0), highest)
+            for _ in range(randomizer.randint(0, highest)):
+                elevator.up_1()
+            controller.add_elevator(elevator)
+        controller.elevators[3].move_to(2)
+        people = [
+            Person("Jess", randomizer.randint(-5, 10), randomizer.randint(-5, 10))
+            for _ in range(30)
+        ]
+        return controller, people
+
+    @staticmethod
+    def positions(called):
+        return [elevator and elevator.position for elevator in called]
+
+    def called_one_by_one(self):
+        controller, people = self.build_busy_building()
+        called = self.positions(
+            [controller.call_elevator_for(person) for person in people]
+        )
+        assert any(called) and None in called
+        return called
+
+    def test_assign_batch(self):
+        pytest.importorskip("numpy")
+        controller, people = self.build_busy_building()
+        called = self.positions(controller.assign_batch(people))
+        assert called == self.called_one_by_one()
+
+    def test_assign_batch_without_numpy(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "numpy", None)
+        controller, people = self.build_busy_building()
+        called = self.positions(controller.assign_batch(people))
+        assert called == self.called_one_by_one()
+
+    def test_move_elevators(self, monkeypatch, capsys):
+        monkeypatch.setattr(elevator_module, "VERBOSE", True)
+        flush_log()
+        capsys.readouterr()
+        controller = Controller()
+        elevator = Elevator(0, 4)
+        controller.add_elevator(elevator)
+        elevator.move_to(2)
+        controller.move_elevators()
+        assert elevator.floor == 1
+        assert capsys.readouterr().out == f"{elevator} moved floors 0 -> 1\n"
+        assert controller.free_elevators == []
+        controller.move_elevators()
+        controller.move_elevators()
+        assert elevator.floor == 2
+        assert controller.free_elevators == [elevator]
+
+
+class TestLog:
+    def test_flush_log(self, capsys):
+        flush_log()
+        capsys.readouterr()
+        log("first")
+        log("second")
+        assert capsys.readouterr().out == ""
+        flush_log()
+        assert capsys.readouterr().out == "first\nsecond\n"
+        flush_log()
+        assert capsys.readouterr().out == ""
+
+    def test_not_verbose(self, monkeypatch, capsys):
+        monkeypatch.setattr(elevator_module, "VERBOSE", False)
+        flush_log()
+        capsys.readouterr()
+        elevator = Elevator(0, 4)
+        elevator.open_door()
+        elevator.move()
+        flush_log()
+        assert capsys.readouterr().out == ""
 
 
 class TestDoor:
@@ -50,6 +185,10 @@ class TestElevator:
         assert elevator.is_free
         elevator.moving_to = 1
         assert not elevator.is_free
+        elevator.moving_to = 0
+        assert not elevator.is_free
+        elevator.moving_to = None
+        assert elevator.is_free
 
     def test_invalid_elevator(self):
         Elevator(0, 1)
@@ -61,10 +200,14 @@ class TestElevator:
             Elevator(-3, -2)
         with pytest.raises(ValueError):
             Elevator(1, 2)
-        with pytest.raises(ValueError):
+        # A mypyc compiled module rejects these arguments with a TypeError
+        # before validate() runs
+        with pytest.raises((ValueError, TypeError)):
             Elevator(-1.2, 1)
-        with pytest.raises(ValueError):
+        with pytest.raises((ValueError, TypeError)):
             Elevator("ground", "first")
+        with pytest.raises((ValueError, TypeError)):
+            Elevator(0, 2.5)
 
     def test_cannot_go_above_highest_floor(self):
         elevator = Elevator(0, 1)
@@ -107,24 +250,84 @@ class TestElevator:
         pass
 
     def test_people_leaving(self):
-        # To be added if had time
-        pass
+        elevator = Elevator(0, 4)
+        jess = Person("Jess", 0, 1)
+        jack = Person("Jack", 0, 2)
+        joe = Person("Joe", 0, 1)
+        for person in (jess, jack, joe):
+            elevator.add_person(person)
+        assert list(elevator.people_leaving) == []
+        elevator.up_1()
+        leaving = list(elevator.people_leaving)
+        assert leaving == [jess, joe]
+        for person in leaving:
+            elevator.remove_person(person)
+        assert list(elevator.people.values()) == [jack]
+        assert list(elevator.people_leaving) == []
+        elevator.remove_person(jack)
+        elevator.up_1()
+        assert list(elevator.people_leaving) == []
 
     def test_stop_queue(self):
-        # To be added if had time
-        pass
+        elevator = Elevator(-2, 4)
+        assert elevator.stop_queue is None
+        elevator.add_person(Person("Jess", 0, 3))
+        elevator.add_person(Person("Jack", 0, -2))
+        elevator.add_person(Person("Joe", 0, 1))
+        assert elevator.stop_queue == [3, 1]
+        elevator.up_1()
+        elevator.up_1()
+        assert elevator.stop_queue == [3]
+        elevator.up_1()
+        assert elevator.stop_queue == []
 
     def test_stops(self):
-        # To be added if had time
-        pass
+        elevator = Elevator(-2, 4)
+        assert elevator.stops == []
+        jess, jack = Person("Jess", 0, 3), Person("Jack", 0, -2)
+        elevator.add_person(jess)
+        elevator.add_person(jack)
+        assert elevator.stops == [3, -2]
+        elevator.remove_person(jess)
+        assert elevator.stops == [-2]
 
     def test_move_to(self):
         # To be added if had time
         pass
 
     def test_move(self):
-        # To be added if had time
-        pass
+        elevator = Elevator(-2, 4)
+        elevator.move()
+        assert elevator.floor == 0
+        assert elevator.moving_to is None
+
+        elevator.move_to(2)
+        elevator.move()
+        assert elevator.floor == 1
+        elevator.add_person(Person("Jess", 1, 3))
+        elevator.add_person(Person("Jack", 1, -2))
+        elevator.move()
+        assert elevator.floor == 2
+        assert elevator.moving_to == 3
+
+    def test_direction(self):
+        elevator = Elevator(-2, 4)
+        assert elevator.direction == Direction.NOWHERE
+        elevator.move_to(3)
+        assert elevator.direction == Direction.UP
+        elevator.move_to(-1)
+        assert elevator.direction == Direction.DOWN
+        elevator.move_to(0)
+        assert elevator.direction == Direction.NOWHERE
+
+    def test_move_to_ground_floor(self):
+        elevator = Elevator(-2, 4)
+        elevator.down_1()
+        elevator.move_to(0)
+        elevator.move()
+        assert elevator.floor == 0
+        elevator.move()
+        assert elevator.moving_to is None
 
 
 class TestPerson:
@@ -150,3 +353,4 @@ class TestPerson:
     def test_str(self):
         person = Person("Jess", 0, 1)
         assert str(person) == f"<Person id:{person.id} -> ('Jess', 0, 1)"
+        assert repr(person) == str(person)